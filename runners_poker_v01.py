@@ -2,20 +2,13 @@
 
 import streamlit as st
 import pandas as pd
+import numpy as np
+from types import MappingProxyType
 
 # -----------------------------
-# Config
+# Static text and read-only lookup tables
 # -----------------------------
-st.set_page_config(page_title="Runners Poker v0.1", page_icon="🎴")
-
-st.title("🎴 Runners Poker v0.1")
-st.caption("Win Chips → Sit back and realx."
-           " Lose Chips → Time to run. 😈")
-
-# === Rules Expander ===
-with st.expander("📘 How Runners Poker Works"):
-    st.markdown(
-        """
+RULES_MD = """
 ### 🎴 Quick Rules
 
 - Everyone starts with the **same number of chips**.  
@@ -52,8 +45,49 @@ Weighted punishment = `Base KM × Multiplier`.
 
 **Win Chips → no run.  
 Lose Chips → time to run.**
-        """
-    )
+"""
+
+# How to describe the units and action in the summary
+FORFEIT_TYPE_CONFIG = MappingProxyType({
+    "Run (km)": MappingProxyType({"unit": "km", "activity": "run"}),
+    "Cycle (km)": MappingProxyType({"unit": "km", "activity": "cycle"}),
+    "Burpees (reps)": MappingProxyType({"unit": "burpees", "activity": None}),
+    "Steps (x1000)": MappingProxyType({"unit": "k steps", "activity": None}),
+})
+_DEFAULT_CFG = MappingProxyType({"unit": "units", "activity": None})
+
+# Fitness categories & multipliers
+FITNESS_CATEGORIES = ("Couch Potato", "Beginner", "Casual", "Regular", "Athlete")
+MULTIPLIERS = MappingProxyType({
+    "Couch Potato": 0.6,
+    "Beginner": 0.8,
+    "Casual": 1.0,
+    "Regular": 1.2,
+    "Athlete": 1.4,
+})
+
+# Vectorised lookup: category positions index straight into the multiplier array
+FITNESS_DTYPE = pd.CategoricalDtype(FITNESS_CATEGORIES, ordered=True)
+MULTIPLIER_ARR = np.array([MULTIPLIERS[c] for c in FITNESS_CATEGORIES], dtype=np.float64)
+
+
+def fmt_amount(v):
+    """Show a rounded amount as 5 rather than 5.0 (used by the table and summary)."""
+    return f"{int(v)}" if float(v).is_integer() else f"{float(v)}"
+
+
+# -----------------------------
+# Config
+# -----------------------------
+st.set_page_config(page_title="Runners Poker v0.1", page_icon="🎴")
+
+st.title("🎴 Runners Poker v0.1")
+st.caption("Win Chips → Sit back and realx."
+           " Lose Chips → Time to run. 😈")
+
+# === Rules Expander ===
+with st.expander("📘 How Runners Poker Works"):
+    st.markdown(RULES_MD)
 
 st.markdown("### 1. Game Setup")
 
@@ -85,13 +119,9 @@ forfeit_type = st.selectbox(
     help="What kind of punishment is this game using?"
 )
 
-# How to describe the units and action in the summary
-FORFEIT_TYPE_CONFIG = {
-    "Run (km)": {"unit": "km", "activity": "run"},
-    "Cycle (km)": {"unit": "km", "activity": "cycle"},
-    "Burpees (reps)": {"unit": "burpees", "activity": None},
-    "Steps (x1000)": {"unit": "k steps", "activity": None},
-}
+# Resolve the forfeit config once per rerun and reuse it everywhere below
+cfg_forfeit = FORFEIT_TYPE_CONFIG.get(forfeit_type) or _DEFAULT_CFG
+unit_label = cfg_forfeit["unit"]
 
 # 2) Starting chips (always needed)
 col1, col2 = st.columns(2)
@@ -107,12 +137,6 @@ with col1:
 # 3) Max distance only for Equal + Weighted
 with col2:
     if mode_equal or mode_weighted:
-        cfg_forfeit = FORFEIT_TYPE_CONFIG.get(
-            forfeit_type,
-            {"unit": "units", "activity": None}
-        )
-        unit_label = cfg_forfeit["unit"]
-
         max_km = st.number_input(
             f"Max forfeit ({unit_label})",
             min_value=0.1,
@@ -140,82 +164,76 @@ completion_date = st.date_input(
 )
 
 st.markdown("---")
-st.markdown("### 2. Players & Settings")
-
-# Fitness categories & multipliers
-fitness_categories = ["Couch Potato", "Beginner", "Casual", "Regular", "Athlete"]
-multipliers = {
-    "Couch Potato": 0.6,
-    "Beginner": 0.8,
-    "Casual": 1.0,
-    "Regular": 1.2,
-    "Athlete": 1.4,
-}
+# Player + chip inputs sit in a form: edits are buffered client-side and the
+# script only reruns when the form is submitted, not on every keystroke.
+with st.form("calc"):
+    st.markdown("### 2. Players & Settings")
+
+    # Widget values live in st.session_state (keyed by player index), so the
+    # render loops below don't build any per-player data structures.
+    for i in range(num_players):
+        st.markdown(f"**Player {i+1}**")
+        c1, c2 = st.columns(2)
+
+        with c1:
+            name = st.text_input(
+                f"Name for Player {i+1}",
+                value=f"Player {i+1}",
+                key=f"name_{i}"
+            )
 
-players = []
+        if mode_weighted:
+            with c2:
+                st.selectbox(
+                    f"Fitness category for {name}",
+                    options=FITNESS_CATEGORIES,
+                    index=2,  # default "Casual"
+                    key=f"cat_{i}"
+                )
 
-for i in range(num_players):
-    st.markdown(f"**Player {i+1}**")
-    c1, c2 = st.columns(2)
+        elif mode_custom:
+            with c2:
+                st.number_input(
+                    f"Max forfeit for {name} ({unit_label})",
+                    min_value=0.1,
+                    value=10.0,
+                    step=0.5,
+                    key=f"maxkm_{i}"
+                )
 
-    with c1:
-        name = st.text_input(
-            f"Name for Player {i+1}",
-            value=f"Player {i+1}",
-            key=f"name_{i}"
+    st.markdown("---")
+    st.markdown("### 3. Final Chip Counts")
+
+    st.write("After you finish playing poker normally, enter each player’s final chip stack below:")
+
+    # Chips are keyed by index (not name) so renaming a player keeps their stack
+    for i in range(num_players):
+        st.number_input(
+            f"{st.session_state[f'name_{i}']} – final chips",
+            min_value=0,
+            value=0,
+            step=int(starting_chips / 10) if starting_chips >= 10 else 1,
+            key=f"chips_{i}"
         )
 
-    player_data = {"name": name}
-
-    if mode_weighted:
-        with c2:
-            category = st.selectbox(
-                f"Fitness category for {name}",
-                options=fitness_categories,
-                index=2,  # default "Casual"
-                key=f"cat_{i}"
-            )
-        player_data["fitness"] = category
-
-    elif mode_custom:
-        with c2:
-            cfg_forfeit = FORFEIT_TYPE_CONFIG.get(
-                forfeit_type,
-                {"unit": "units", "activity": None}
-            )
-            unit_label = cfg_forfeit["unit"]
-
-            max_km_player = st.number_input(
-                f"Max forfeit for {name} ({unit_label})",
-                min_value=0.1,
-                value=10.0,
-                step=0.5,
-                key=f"maxkm_{i}"
-            )
-        player_data["max_km"] = max_km_player
-
-    players.append(player_data)
-
-st.markdown("---")
-st.markdown("### 3. Final Chip Counts")
-
-st.write("After you finish playing poker normally, enter each player’s final chip stack below:")
-
-total_final_chips = 0
-for p in players:
-    p["chips"] = st.number_input(
-        f"{p['name']} – final chips",
-        min_value=0,
-        value=0,
-        step=int(starting_chips / 10) if starting_chips >= 10 else 1,
-        key=f"chips_{p['name']}"
-    )
-    total_final_chips += p["chips"]
+    submitted = st.form_submit_button("Calculate forfeits 🚀")
 
 # Calculate expected total starting chips
 total_starting_chips = starting_chips * num_players
 
-if st.button("Calculate forfeits 🚀"):
+if submitted:
+    # Gather player inputs from session state only when we actually compute
+    players = [
+        {
+            "name": st.session_state[f"name_{i}"],
+            "chips": st.session_state[f"chips_{i}"],
+            "fitness": st.session_state.get(f"cat_{i}", "Casual"),
+            "max_km": st.session_state.get(f"maxkm_{i}", 10.0),
+        }
+        for i in range(num_players)
+    ]
+    total_final_chips = sum(p["chips"] for p in players)
+
     # Non-blocking sanity check for chip total
     if total_final_chips != total_starting_chips:
         diff = total_final_chips - total_starting_chips
@@ -234,101 +252,68 @@ if st.button("Calculate forfeits 🚀"):
             )
 
     # Configure unit labels for the table + summary
-    cfg = FORFEIT_TYPE_CONFIG.get(forfeit_type, {"unit": "units", "activity": None})
-    unit = cfg["unit"]
-    activity = cfg["activity"]
+    unit = unit_label
+    activity = cfg_forfeit["activity"]
     forfeit_col_name = f"Forfeit ({unit})"
     player_max_col_name = f"Player max ({unit})"
 
-    # Compute forfeits
-    rows = []
-    for p in players:
-        chips = p["chips"]
-
-        # Chip ratio
-        chip_ratio = min(chips / starting_chips, 1) if starting_chips > 0 else 0
+    # Compute forfeits (vectorised across players)
+    chips = np.fromiter((p["chips"] for p in players), dtype=np.float64, count=num_players)
+    chip_ratio = np.minimum(chips / starting_chips, 1.0)
 
-        # Equal / base km using global max_km (for equal + weighted)
-        if mode_equal or mode_weighted:
-            base_km_equal = 0.0 if chips >= starting_chips else max_km * (1 - chip_ratio)
-        else:
-            base_km_equal = None
+    # Per-player ceiling: global max_km for equal + weighted, own max for custom
+    if mode_custom:
+        max_arr = np.fromiter((p.get("max_km", 10.0) for p in players), dtype=np.float64, count=num_players)
+    else:
+        max_arr = np.full(num_players, max_km, dtype=np.float64)
 
-        # Weighted km (if applicable)
-        if mode_weighted:
-            mult = multipliers.get(p.get("fitness", "Casual"), 1.0)
-            forfeit_km = base_km_equal * mult
+    # Fitness multiplier (weighted only)
+    if mode_weighted:
+        fitness = [p["fitness"] for p in players]
+        codes = FITNESS_DTYPE.categories.get_indexer(fitness)
+        # Unknown categories get code -1; fall back to x1.0 rather than index from the end
+        mult_arr = np.where(codes >= 0, MULTIPLIER_ARR[codes], 1.0)
+    else:
+        mult_arr = np.ones(num_players, dtype=np.float64)
 
-        # Custom km (per-player max)
-        elif mode_custom:
-            player_max = p.get("max_km", 10.0)
-            base_km_custom = 0.0 if chips >= starting_chips else player_max * (1 - chip_ratio)
-            forfeit_km = base_km_custom
+    forfeit = np.where(chips >= starting_chips, 0.0, max_arr * (1.0 - chip_ratio)) * mult_arr
 
-        # Equal mode
-        else:  # mode_equal
-            forfeit_km = base_km_equal
+    # Round once for the whole column
+    forfeit_disp = np.round(forfeit, 2)
 
-        # Build row depending on mode
-        if mode_weighted:
-            rows.append(
-                {
-                    "Player": p["name"],
-                    "Fitness category": p.get("fitness", "-"),
-                    "Final chips": chips,
-                    "Chip % of start": round(chip_ratio * 100, 1),
-                    forfeit_col_name: (int(round(forfeit_km, 2)) if float(round(forfeit_km, 2)).is_integer() else round(forfeit_km, 2)),
-                }
-            )
-        elif mode_custom:
-            rows.append(
-                {
-                    "Player": p["name"],
-                    player_max_col_name: (int(round(p.get("max_km", 10.0), 2)) if float(round(p.get("max_km", 10.0), 2)).is_integer() else round(p.get("max_km", 10.0), 2)),
-                    "Final chips": chips,
-                    "Chip % of start": round(chip_ratio * 100, 1),
-                    forfeit_col_name: (int(round(forfeit_km, 2)) if float(round(forfeit_km, 2)).is_integer() else round(forfeit_km, 2)),
-                }
-            )
-        else:  # Equal
-            rows.append(
-                {
-                    "Player": p["name"],
-                    "Final chips": chips,
-                    "Chip % of start": round(chip_ratio * 100, 1),
-                    forfeit_col_name: (int(round(forfeit_km, 2)) if float(round(forfeit_km, 2)).is_integer() else round(forfeit_km, 2)),
-                }
-            )
+    # Build the table column-wise; extra column depends on mode
+    names = [p["name"] for p in players]
+    data = {"Player": names}
+    if mode_weighted:
+        data["Fitness category"] = fitness
+    elif mode_custom:
+        data[player_max_col_name] = np.round(max_arr, 2)
+    data["Final chips"] = chips.astype(np.int64)
+    data["Chip % of start"] = np.round(chip_ratio * 100, 1)
+    data[forfeit_col_name] = forfeit_disp
 
-    df = pd.DataFrame(rows)
+    df = pd.DataFrame(data)
 
     st.markdown("### 4. Forfeit Results")
-    st.dataframe(df, width="stretch")
+    amount_cols = [c for c in (player_max_col_name, forfeit_col_name) if c in df.columns]
+    # Every float column needs a formatter, or the Styler pads it to 6 decimals
+    formats = {c: fmt_amount for c in amount_cols}
+    formats["Chip % of start"] = "{:.1f}"
+    st.dataframe(df.style.format(formats), width="stretch")
 
     st.markdown("#### Summary")
 
-    for r in rows:
-        amount = r[forfeit_col_name]
-        if amount == 0:
-            if activity:
-                st.write(
-                    f"**{r['Player']}** → 🎉 **No {activity} required!** (0 {unit})"
-                )
-            else:
-                st.write(
-                    f"**{r['Player']}** → 🎉 **No {unit} required!** (0 {unit})"
-                )
-        else:
-            if activity:
-                st.write(
-                    f"**{r['Player']}** → {amount} {unit} to {activity} "
-                    f"by **{completion_date.strftime('%d %b %Y')}**."
-                )
-            else:
-                st.write(
-                    f"**{r['Player']}** → {amount} {unit} "
-                    f"by **{completion_date.strftime('%d %b %Y')}**."
-                )
+    deadline_str = completion_date.strftime('%d %b %Y')
+    no_forfeit_msg = f"🎉 **No {activity or unit} required!** (0 {unit})"
+    action = f" to {activity}" if activity else ""
+
+    # One markdown block for the whole summary instead of a write per player
+    lines = [
+        f"- **{player}** → {no_forfeit_msg}" if amount == 0
+        else f"- **{player}** → {fmt_amount(amount)} {unit}{action} by **{deadline_str}**."
+        for player, amount in zip(names, forfeit_disp)
+    ]
+    st.markdown("\n".join(lines))
 
     # New game / reset button
     if st.button("🔄 New game / reset"):